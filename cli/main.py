@@ -25,9 +25,18 @@ Examples:
   duckai chat --model claude-3-haiku "Explain quantum computing"
   duckai interactive
   duckai models
+  duckai --profile ./profiles chat "Hello"
         """,
     )
 
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        default=None,
+        help="Write per-request stack and allocation profiles to DIR "
+        "(or set DUCKAI_PROFILE)",
+    )
+
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
     # Chat command
@@ -54,7 +63,7 @@ Examples:
 
 def cmd_chat(args) -> int:
     """Handle chat command"""
-    client = DuckAIClient()
+    client = DuckAIClient(profile_dir=args.profile)
     message = " ".join(args.message)
 
     try:
@@ -72,9 +81,9 @@ def cmd_chat(args) -> int:
         return 1
 
 
-def cmd_interactive() -> int:
+def cmd_interactive(args) -> int:
     """Handle interactive mode"""
-    client = DuckAIClient()
+    client = DuckAIClient(profile_dir=args.profile)
     print("DuckAI Interactive Mode")
     print("Type 'exit' or 'quit' to exit, 'models' to list models")
     print("-" * 50)
@@ -151,7 +160,7 @@ def main() -> int:
     if args.command == "chat":
         return cmd_chat(args)
     elif args.command == "interactive":
-        return cmd_interactive()
+        return cmd_interactive(args)
     elif args.command == "models":
         return cmd_models()
 
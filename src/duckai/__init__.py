@@ -3,7 +3,18 @@
 __version__ = "0.1.0"
 __author__ = "DuckAI"
 
+from .cache import PromptCache
 from .client import DuckAIClient
-from .models import Message, Conversation
+from .models import Message, Conversation, HistoryNode
+from .scheduler import RequestScheduler, PRIORITY_INTERACTIVE, PRIORITY_BATCH
 
-__all__ = ["DuckAIClient", "Message", "Conversation"]
+__all__ = [
+    "DuckAIClient",
+    "Message",
+    "Conversation",
+    "HistoryNode",
+    "PromptCache",
+    "RequestScheduler",
+    "PRIORITY_INTERACTIVE",
+    "PRIORITY_BATCH",
+]
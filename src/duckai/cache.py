@@ -0,0 +1,302 @@
+"""Approximate prompt cache for DuckAI"""
+
+import hashlib
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from .utils import clean_text
+
+
+# Sentence punctuation only; a "." between digits (3.5) is kept. Operators
+# and symbols such as + - * / # = % are meaningful ("C++", "2*2") and stay.
+_PUNCTUATION_RE = re.compile(r"""[,!?;:"'`()\[\]{}]|(?<!\d)\.|\.(?!\d)""")
+
+
+def strip_punctuation(text: str) -> str:
+    """Replace sentence punctuation with spaces, keeping symbols"""
+    return _PUNCTUATION_RE.sub(" ", text)
+
+
+DEFAULT_PIPELINE: Tuple[Callable[[str], str], ...] = (
+    str.lower,
+    strip_punctuation,
+    clean_text,
+)
+
+
+# Words whose presence never changes what is being asked. Kept deliberately
+# small: negations, pronouns and quantifiers must never be listed here.
+DEFAULT_FILLER_WORDS: FrozenSet[str] = frozenset(
+    {"please", "pls", "kindly", "hey", "hi", "hello", "just", "quickly"}
+    | {"a", "an", "the", "so", "ok", "okay", "um", "uh"}
+)
+
+
+def normalize_prompt(
+    text: str, pipeline: Sequence[Callable[[str], str]] = DEFAULT_PIPELINE
+) -> str:
+    """Run text through each normalization step in order"""
+    for step in pipeline:
+        text = step(text)
+    return text
+
+
+def shingles(text: str, size: int = 2) -> FrozenSet[str]:
+    """Word n-grams of a normalized prompt"""
+    words = text.split()
+    if len(words) <= size:
+        return frozenset([" ".join(words)])
+    return frozenset(
+        " ".join(words[i : i + size]) for i in range(len(words) - size + 1)
+    )
+
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+def _permutations(count: int) -> List[Tuple[int, int]]:
+    """Deterministic (a, b) pairs for universal hashing"""
+    return [
+        (
+            _hash64(f"a{i}") % (_MERSENNE_PRIME - 1) + 1,
+            _hash64(f"b{i}") % _MERSENNE_PRIME,
+        )
+        for i in range(count)
+    ]
+
+
+def minhash(
+    features: FrozenSet[str], perms: Sequence[Tuple[int, int]]
+) -> Tuple[int, ...]:
+    """MinHash signature of a feature set"""
+    hashes = [_hash64(feature) for feature in features] or [0]
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in perms
+    )
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two sets"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class CacheStats:
+    """Prompt cache hit/miss counters"""
+
+    hits: int = 0
+    exact_hits: int = 0
+    near_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def word_edits(a: Sequence[str], b: Sequence[str]) -> int:
+    """Number of words added or removed to turn one bag of words into another"""
+    diff = Counter(a)
+    diff.subtract(b)
+    return sum(abs(n) for n in diff.values())
+
+
+@dataclass
+class _Entry:
+    model: str
+    normalized: str
+    features: FrozenSet[str]
+    signature: Tuple[int, ...]
+    core: Tuple[str, ...]
+    response: str
+
+
+class PromptCache:
+    """
+    Cache responses for identical or near-identical prompts
+
+    Prompts are normalized through a configurable pipeline (lowercase,
+    sentence punctuation to spaces, clean_text by default). An exact
+    normalized match is a hit. Otherwise the prompt's MinHash signature is
+    split into bands and only entries sharing a band are considered.
+    Memory is bounded by max_entries with LRU eviction.
+
+    A candidate is a near match only if all of these hold:
+
+    - with filler words (``filler_words``) removed, both prompts are the
+      same word sequence, so any change to a number, operator, negation
+      or word order is a miss regardless of prompt length;
+    - at most ``max_word_edits`` filler words were added or removed;
+    - the Jaccard similarity of the prompts' word n-gram sets (bigrams by
+      default) reaches the model's threshold.
+
+    A threshold of 1.0 turns near matching off for that model, leaving
+    exact normalized matches only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        threshold: float = 0.9,
+        thresholds: Optional[Dict[str, float]] = None,
+        pipeline: Sequence[Callable[[str], str]] = DEFAULT_PIPELINE,
+        bands: int = 8,
+        rows: int = 4,
+        shingle_size: int = 2,
+        filler_words: FrozenSet[str] = DEFAULT_FILLER_WORDS,
+        max_word_edits: int = 2,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.thresholds: Dict[str, float] = dict(thresholds or {})
+        self.pipeline = tuple(pipeline)
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+        self.filler_words = frozenset(filler_words)
+        self.max_word_edits = max_word_edits
+
+        self._perms = _permutations(bands * rows)
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._buckets: Dict[tuple, Set[Tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def threshold_for(self, model: str) -> float:
+        """Similarity threshold for a model"""
+        return self.thresholds.get(model, self.threshold)
+
+    def _band_keys(self, model: str, signature: Tuple[int, ...]) -> List[tuple]:
+        return [
+            (model, i, signature[i * self.rows : (i + 1) * self.rows])
+            for i in range(self.bands)
+        ]
+
+    def _core(self, words: Sequence[str]) -> Tuple[str, ...]:
+        return tuple(w for w in words if w not in self.filler_words)
+
+    def get(self, prompt: str, model: str) -> Optional[str]:
+        """
+        Look up a cached response
+
+        Returns:
+            Cached response text, or None on a miss
+        """
+        normalized = normalize_prompt(prompt, self.pipeline)
+
+        with self._lock:
+            entry = self._entries.get((model, normalized))
+            if entry is not None:
+                self._entries.move_to_end((model, normalized))
+                self._stats.hits += 1
+                self._stats.exact_hits += 1
+                return entry.response
+
+        threshold = self.threshold_for(model)
+        if threshold >= 1.0:
+            with self._lock:
+                self._stats.misses += 1
+            return None
+
+        words = normalized.split()
+        core = self._core(words)
+        features = shingles(normalized, self.shingle_size)
+        signature = minhash(features, self._perms)
+
+        with self._lock:
+            candidates: Set[Tuple[str, str]] = set()
+            for band_key in self._band_keys(model, signature):
+                candidates |= self._buckets.get(band_key, set())
+
+            best_key, best_score = None, threshold
+            for key in candidates:
+                entry = self._entries[key]
+                if entry.core != core:
+                    continue
+                if word_edits(words, entry.normalized.split()) > self.max_word_edits:
+                    continue
+                score = jaccard(features, entry.features)
+                if score >= best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None:
+                self._stats.misses += 1
+                return None
+
+            self._entries.move_to_end(best_key)
+            self._stats.hits += 1
+            self._stats.near_hits += 1
+            return self._entries[best_key].response
+
+    def put(self, prompt: str, model: str, response: str):
+        """Store a response for a prompt"""
+        normalized = normalize_prompt(prompt, self.pipeline)
+        features = shingles(normalized, self.shingle_size)
+        signature = minhash(features, self._perms)
+        key = (model, normalized)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(
+                model,
+                normalized,
+                features,
+                signature,
+                self._core(normalized.split()),
+                response,
+            )
+            for band_key in self._band_keys(model, signature):
+                self._buckets.setdefault(band_key, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def _remove(self, key: Tuple[str, str]):
+        """Drop an entry and its bucket references; caller must hold the lock"""
+        entry = self._entries.pop(key)
+        for band_key in self._band_keys(entry.model, entry.signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def clear(self):
+        """Remove all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self) -> CacheStats:
+        """Get a snapshot of hit/miss counters"""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                exact_hits=self._stats.exact_hits,
+                near_hits=self._stats.near_hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                entries=len(self._entries),
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -9,6 +9,10 @@ import gzip
 import zlib
 from typing import Optional, List, Dict, Any, Generator, Tuple
 
+from .cache import PromptCache
+from .models import Message, HistoryNode
+from .profiling import get_profile_dir, profile_request
+
 # Optional Brotli support
 try:
     import brotli
@@ -23,7 +27,11 @@ class DuckAIClient:
 
     BASE_URL = "https://duckduckgo.com"
 
-    def __init__(self):
+    def __init__(
+        self,
+        profile_dir: Optional[str] = None,
+        cache: Optional[PromptCache] = None,
+    ):
         # Initialize cookie jar to persist cookies across requests
         self.cookie_jar = http.cookiejar.CookieJar()
         self.cookie_processor = urllib.request.HTTPCookieProcessor(self.cookie_jar)
@@ -33,7 +41,59 @@ class DuckAIClient:
         self.vqd: Optional[str] = None
         self.vqd_hash: Optional[str] = None
         self.conversation_id: Optional[str] = None
-        self.messages: List[Dict[str, str]] = []
+        self.history: Optional[HistoryNode] = None
+
+        # Write per-request profiles here (falls back to DUCKAI_PROFILE)
+        self.profile_dir: Optional[str] = get_profile_dir(profile_dir)
+
+        # Optional near-duplicate prompt cache (first turn only)
+        self.cache = cache
+
+    @property
+    def messages(self) -> Tuple[Dict[str, str], ...]:
+        """
+        Conversation history in API format
+
+        Read-only snapshot; use fork()/checkout() or assign a new list to
+        change the history.
+        """
+        if self.history is None:
+            return ()
+        return tuple(self.history.to_api_format())
+
+    @messages.setter
+    def messages(self, messages: List[Dict[str, str]]):
+        self.history = HistoryNode.from_messages(
+            Message(role=msg["role"], content=msg["content"]) for msg in messages
+        )
+
+    def _add_message(self, role: str, content: str):
+        """Append a message to the current history branch"""
+        self.history = HistoryNode(
+            message=Message(role=role, content=content), parent=self.history
+        )
+
+    def _cache_lookup(self, message: str, model: str) -> Optional[str]:
+        """
+        Answer a fresh conversation from the prompt cache
+
+        Cached answers only depend on the prompt, so follow-up turns (which
+        depend on earlier history) are never served from the cache.
+        """
+        if self.cache is None or self.history is not None:
+            return None
+
+        cached = self.cache.get(message, model)
+        if cached is not None:
+            self._add_message("user", message)
+            self._add_message("assistant", cached)
+        return cached
+
+    def _build_chat_data(self, model: str) -> bytes:
+        """Serialize chat payload, reusing the history's cached JSON"""
+        messages_json = self.history.to_json() if self.history else "[]"
+        payload = '{"model": %s, "messages": %s}' % (json.dumps(model), messages_json)
+        return payload.encode("utf-8")
 
     def _get_headers(self, extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
         """Get request headers mimicking Chrome browser"""
@@ -185,15 +245,24 @@ class DuckAIClient:
         Returns:
             Complete response text
         """
+        if not self.profile_dir:
+            return self._chat(message, model)
+        with profile_request("chat", self.profile_dir):
+            return self._chat(message, model)
+
+    def _chat(self, message: str, model: str) -> str:
+        """Send a chat message and collect the full response"""
+        cached = self._cache_lookup(message, model)
+        if cached is not None:
+            return cached
+        cacheable = self.cache is not None and self.history is None
+
         # Get VQD if not available
         if not self.vqd:
             self.get_vqd()
 
         # Add message to history
-        self.messages.append({"role": "user", "content": message})
-
-        # Build request
-        payload = {"model": model, "messages": self.messages}
+        self._add_message("user", message)
 
         headers = {"content-type": "application/json", "x-vqd-4": self.vqd}
 
@@ -201,7 +270,7 @@ class DuckAIClient:
         if self.vqd_hash:
             headers["x-vqd-hash-1"] = self.vqd_hash
 
-        data = json.dumps(payload).encode("utf-8")
+        data = self._build_chat_data(model)
 
         # Make request and stream response
         url = f"{self.BASE_URL}/duckchat/v1/chat"
@@ -254,7 +323,9 @@ class DuckAIClient:
         # Add assistant response to history
         full_response = "".join(response_chunks)
         if full_response:
-            self.messages.append({"role": "assistant", "content": full_response})
+            self._add_message("assistant", full_response)
+            if cacheable:
+                self.cache.put(message, model, full_response)
 
         return full_response
 
@@ -271,15 +342,26 @@ class DuckAIClient:
         Yields:
             Response chunks as they arrive
         """
+        if not self.profile_dir:
+            yield from self._stream_chat(message, model)
+            return
+        with profile_request("stream_chat", self.profile_dir):
+            yield from self._stream_chat(message, model)
+
+    def _stream_chat(self, message: str, model: str) -> Generator[str, None, None]:
+        """Send a chat message and yield response chunks"""
+        cached = self._cache_lookup(message, model)
+        if cached is not None:
+            yield cached
+            return
+        cacheable = self.cache is not None and self.history is None
+
         # Get VQD if not available
         if not self.vqd:
             self.get_vqd()
 
         # Add message to history
-        self.messages.append({"role": "user", "content": message})
-
-        # Build request
-        payload = {"model": model, "messages": self.messages}
+        self._add_message("user", message)
 
         headers = {"content-type": "application/json", "x-vqd-4": self.vqd}
 
@@ -287,7 +369,7 @@ class DuckAIClient:
         if self.vqd_hash:
             headers["x-vqd-hash-1"] = self.vqd_hash
 
-        data = json.dumps(payload).encode("utf-8")
+        data = self._build_chat_data(model)
 
         # Make request
         url = f"{self.BASE_URL}/duckchat/v1/chat"
@@ -330,9 +412,9 @@ class DuckAIClient:
                             # Add full response to history
                             complete = "".join(full_response)
                             if complete:
-                                self.messages.append(
-                                    {"role": "assistant", "content": complete}
-                                )
+                                self._add_message("assistant", complete)
+                                if cacheable:
+                                    self.cache.put(message, model, complete)
                             return
 
                         try:
@@ -346,7 +428,28 @@ class DuckAIClient:
 
     def clear_history(self):
         """Clear conversation history"""
-        self.messages = []
+        self.history = None
+
+    def fork(self) -> Optional[HistoryNode]:
+        """
+        Snapshot the current history as a branch point
+
+        History nodes are immutable, so the returned node stays valid while
+        the client keeps chatting. Branches share the prefix in memory.
+
+        Returns:
+            Current history node (None for an empty conversation)
+        """
+        return self.history
+
+    def checkout(self, node: Optional[HistoryNode]):
+        """
+        Continue the conversation from a branch point returned by fork()
+
+        Args:
+            node: History node to make current (None starts a fresh history)
+        """
+        self.history = node
 
     def get_available_models(self) -> List[str]:
         """Get list of available AI models"""
@@ -1,7 +1,8 @@
 """Data models for DuckAI"""
 
-from dataclasses import dataclass
-from typing import Optional, List
+import json
+from dataclasses import dataclass, field
+from typing import Optional, List, Iterable, Iterator
 from datetime import datetime
 
 
@@ -23,6 +24,65 @@ class Message:
         return {"role": self.role, "content": self.content}
 
 
+@dataclass(frozen=True, eq=False)
+class HistoryNode:
+    """
+    Immutable node in a shared-prefix conversation history tree
+
+    Each node points at its parent, so any number of branches forked from
+    the same point share the prefix instead of copying it. The serialized
+    form of each message is computed once and reused by every branch.
+    """
+
+    message: Message
+    parent: Optional["HistoryNode"] = field(default=None, repr=False)
+    depth: int = field(init=False, compare=False)
+    _json: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        depth = self.parent.depth + 1 if self.parent is not None else 1
+        object.__setattr__(self, "depth", depth)
+        object.__setattr__(self, "_json", json.dumps(self.message.to_dict()))
+
+    @classmethod
+    def from_messages(
+        cls, messages: Iterable[Message], parent: Optional["HistoryNode"] = None
+    ) -> Optional["HistoryNode"]:
+        """Build a chain of nodes from messages, returning the last one"""
+        node = parent
+        for msg in messages:
+            node = cls(message=msg, parent=node)
+        return node
+
+    def __len__(self) -> int:
+        return self.depth
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self.messages())
+
+    def nodes(self) -> List["HistoryNode"]:
+        """Nodes from the root down to this one"""
+        chain = []
+        node: Optional[HistoryNode] = self
+        while node is not None:
+            chain.append(node)
+            node = node.parent
+        chain.reverse()
+        return chain
+
+    def messages(self) -> List[Message]:
+        """Messages from the root down to this one"""
+        return [node.message for node in self.nodes()]
+
+    def to_api_format(self) -> List[dict]:
+        """Convert history to API format"""
+        return [node.message.to_dict() for node in self.nodes()]
+
+    def to_json(self) -> str:
+        """Serialize history as a JSON array using the cached per-node form"""
+        return "[" + ", ".join(node._json for node in self.nodes()) + "]"
+
+
 @dataclass
 class Conversation:
     """Represents a conversation session"""
@@ -41,3 +101,12 @@ class Conversation:
     def to_api_format(self) -> List[dict]:
         """Convert conversation to API format"""
         return [msg.to_dict() for msg in self.messages]
+
+    def to_history(self) -> Optional[HistoryNode]:
+        """
+        Convert the conversation to a history node
+
+        Branches forked from the returned node share this conversation's
+        messages instead of copying them.
+        """
+        return HistoryNode.from_messages(self.messages)
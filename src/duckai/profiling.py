@@ -0,0 +1,196 @@
+"""Opt-in profiling for the DuckAI chat hot path"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Generator, Optional
+
+PROFILE_ENV = "DUCKAI_PROFILE"
+
+_request_ids = itertools.count(1)
+
+# tracemalloc is process-wide, so overlapping profiles share one session
+_tracing_lock = threading.Lock()
+_active_profiles = 0
+_owns_tracing = False
+
+
+def get_profile_dir(profile_dir: Optional[str] = None) -> Optional[str]:
+    """Resolve the profile output directory from argument or environment"""
+    return profile_dir or os.environ.get(PROFILE_ENV) or None
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Sample the call stack of one thread at a fixed interval
+
+    Samples are aggregated into collapsed-stack form ("a;b;c count"), which
+    flamegraph.pl, speedscope and inferno read directly.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.001):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="duckai-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        """Get samples in collapsed-stack format"""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+
+def _take_snapshot():
+    """Snapshot without tracemalloc's and the profiler's own allocations"""
+    return tracemalloc.take_snapshot().filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            # The sampler thread's startup
+            tracemalloc.Filter(False, threading.__file__),
+        ]
+    )
+
+
+def _allocation_report(snapshot, baseline, peak: int, limit: int = 25) -> str:
+    lines = [f"Peak traced memory: {peak / 1024:.1f} KiB", ""]
+    stats = [
+        stat
+        for stat in snapshot.compare_to(baseline, "lineno")
+        if stat.size_diff > 0
+    ]
+    lines.append(f"Top {min(limit, len(stats))} allocation sites since start:")
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        lines.append(
+            f"{stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks  "
+            f"{frame.filename}:{frame.lineno}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _start_tracing():
+    """Start tracemalloc for the first active profile"""
+    global _active_profiles, _owns_tracing
+    with _tracing_lock:
+        if _active_profiles == 0:
+            # Leave tracemalloc running if someone else started it
+            _owns_tracing = not tracemalloc.is_tracing()
+            if _owns_tracing:
+                tracemalloc.start()
+            elif hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+                tracemalloc.reset_peak()
+        _active_profiles += 1
+
+
+def _stop_tracing():
+    """Stop tracemalloc once the last active profile finishes"""
+    global _active_profiles, _owns_tracing
+    with _tracing_lock:
+        _active_profiles -= 1
+        if _active_profiles == 0 and _owns_tracing:
+            tracemalloc.stop()
+            _owns_tracing = False
+
+
+def _write_reports(
+    name: str, paths: Dict[str, str], sampler, baseline, elapsed: float
+):
+    with open(paths["collapsed"], "w", encoding="utf-8") as f:
+        f.write(sampler.collapsed())
+
+    with open(paths["alloc"], "w", encoding="utf-8") as f:
+        f.write(f"Request: {name}\nWall time: {elapsed:.3f}s\n")
+        f.write(f"Samples: {sum(sampler.samples.values())}\n")
+        if baseline is None or not tracemalloc.is_tracing():
+            f.write("Allocation tracing was stopped externally\n")
+            return
+        snapshot = _take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        f.write(_allocation_report(snapshot, baseline, peak))
+
+
+@contextmanager
+def profile_request(
+    name: str,
+    profile_dir: Optional[str] = None,
+    interval: float = 0.001,
+) -> Generator[Optional[Dict[str, str]], None, None]:
+    """
+    Profile one request with stack sampling and tracemalloc
+
+    Does nothing unless a profile directory is given or DUCKAI_PROFILE is
+    set. Otherwise writes ``<name>-<pid>-<n>.collapsed`` (flamegraph-ready
+    stacks) and ``<name>-<pid>-<n>.alloc.txt`` (allocation growth per site
+    since the request started) there.
+    Overlapping profiles share one tracemalloc session, so their reported
+    peak memory covers all requests active at the time.
+
+    Yields:
+        Dict with "collapsed" and "alloc" report paths, or None when off
+    """
+    profile_dir = get_profile_dir(profile_dir)
+    if not profile_dir:
+        yield None
+        return
+
+    os.makedirs(profile_dir, exist_ok=True)
+    base = os.path.join(profile_dir, f"{name}-{os.getpid()}-{next(_request_ids)}")
+    paths = {"collapsed": base + ".collapsed", "alloc": base + ".alloc.txt"}
+
+    _start_tracing()
+    try:
+        baseline = _take_snapshot()
+    except RuntimeError:  # tracing stopped by someone else
+        baseline = None
+    sampler = StackSampler(interval=interval)
+    start = time.perf_counter()
+    sampler.start()
+    try:
+        yield paths
+    finally:
+        sampler.stop()
+        elapsed = time.perf_counter() - start
+        # Never let a reporting failure replace the request's own outcome
+        try:
+            _write_reports(name, paths, sampler, baseline, elapsed)
+        except Exception as e:
+            warnings.warn(f"Failed to write profile for {name}: {e}", RuntimeWarning)
+        finally:
+            _stop_tracing()
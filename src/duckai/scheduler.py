@@ -0,0 +1,254 @@
+"""Priority-aware request scheduler for DuckAI"""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# Priority classes (lower runs first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+
+@dataclass
+class SchedulerStats:
+    """Snapshot of scheduler queue state"""
+
+    queue_depth: Dict[int, int]
+    running: int
+    completed: int
+    avg_wait: float
+    max_wait: float
+    oldest_wait: float
+    tenant_depth: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class _Job:
+    fn: Callable[..., Any]
+    args: tuple
+    kwargs: dict
+    future: Future
+    priority: int
+    tenant: str
+    enqueued_at: float
+
+
+def _check_positive(name: str, value: float):
+    if value <= 0:
+        raise ValueError(f"{name} must be positive")
+
+
+class RequestScheduler:
+    """
+    Run chat requests with bounded concurrency and priority ordering
+
+    Queued work is admitted by priority class first, so interactive requests
+    always start ahead of queued batch requests. Within a class, tenants
+    share capacity by weighted fair queuing: each job gets a virtual finish
+    tag of ``max(virtual_time, tenant_last_tag) + cost / weight`` and the
+    smallest tag runs next.
+
+    DuckAIClient is not thread-safe; submit work that uses one client per
+    job (or per tenant with a single in-flight request).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 2,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        for weight in (weights or {}).values():
+            _check_positive("weight", weight)
+
+        self.max_concurrency = max_concurrency
+        self.weights: Dict[str, float] = dict(weights or {})
+
+        self._cond = threading.Condition()
+        self._queues: Dict[int, List[tuple]] = {}
+        self._seq = itertools.count()
+        self._virtual_time: Dict[int, float] = {}
+        # Per (priority, tenant); dropped once the tenant has nothing queued
+        self._last_tag: Dict[tuple, float] = {}
+        self._class_depth: Dict[tuple, int] = {}
+        self._tenant_depth: Dict[str, int] = {}
+        self._shutdown = False
+
+        # Stats
+        self._running = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"duckai-sched-{i}", daemon=True)
+            for i in range(max_concurrency)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def set_weight(self, tenant: str, weight: float):
+        """Set the fair-share weight of a tenant (default 1.0)"""
+        _check_positive("weight", weight)
+        with self._cond:
+            self.weights[tenant] = weight
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        priority: int = PRIORITY_BATCH,
+        tenant: str = "default",
+        cost: float = 1.0,
+        **kwargs,
+    ) -> Future:
+        """
+        Queue a call to run when capacity is available
+
+        Args:
+            fn: Callable to run, e.g. client.chat
+            priority: PRIORITY_INTERACTIVE, PRIORITY_BATCH or any int
+            tenant: Tenant or job name used for fair queuing
+            cost: Relative cost of the job (e.g. expected tokens), positive
+
+        Returns:
+            Future resolving to fn's return value
+        """
+        _check_positive("cost", cost)
+        future: Future = Future()
+        job = _Job(fn, args, kwargs, future, priority, tenant, time.monotonic())
+
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Scheduler has been shut down")
+
+            vtime = self._virtual_time.get(priority, 0.0)
+            start = max(vtime, self._last_tag.get((priority, tenant), 0.0))
+            tag = start + cost / self.weights.get(tenant, 1.0)
+            self._last_tag[(priority, tenant)] = tag
+            self._class_depth[(priority, tenant)] = (
+                self._class_depth.get((priority, tenant), 0) + 1
+            )
+
+            heapq.heappush(
+                self._queues.setdefault(priority, []), (tag, next(self._seq), job)
+            )
+            self._tenant_depth[tenant] = self._tenant_depth.get(tenant, 0) + 1
+            self._cond.notify()
+
+        return future
+
+    def interactive(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue a call in the interactive priority class"""
+        return self.submit(fn, *args, priority=PRIORITY_INTERACTIVE, **kwargs)
+
+    def batch(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue a call in the batch priority class"""
+        return self.submit(fn, *args, priority=PRIORITY_BATCH, **kwargs)
+
+    def _next_job(self) -> Optional[_Job]:
+        """Pop the next job; caller must hold the lock"""
+        for priority in sorted(self._queues):
+            queue = self._queues[priority]
+            if queue:
+                tag, _, job = heapq.heappop(queue)
+                self._virtual_time[priority] = tag
+
+                # A returning tenant would restart at the virtual time anyway
+                key = (priority, job.tenant)
+                self._class_depth[key] -= 1
+                if not self._class_depth[key] and self._last_tag[key] <= tag:
+                    del self._class_depth[key]
+                    del self._last_tag[key]
+                return job
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    if self._shutdown:
+                        return
+                    self._cond.wait()
+                    job = self._next_job()
+
+                self._tenant_depth[job.tenant] -= 1
+                if not self._tenant_depth[job.tenant]:
+                    del self._tenant_depth[job.tenant]
+
+                # Skip jobs the caller cancelled while they were queued
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+
+                wait = time.monotonic() - job.enqueued_at
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+                self._running += 1
+
+            try:
+                job.future.set_result(job.fn(*job.args, **job.kwargs))
+            except BaseException as e:
+                job.future.set_exception(e)
+
+            with self._cond:
+                self._running -= 1
+                self._completed += 1
+
+    def queue_depth(self, priority: Optional[int] = None) -> int:
+        """Number of queued (not yet running) jobs"""
+        with self._cond:
+            if priority is not None:
+                return len(self._queues.get(priority, []))
+            return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> SchedulerStats:
+        """Get queue depth and wait time statistics"""
+        now = time.monotonic()
+        with self._cond:
+            queued = [job for queue in self._queues.values() for _, _, job in queue]
+            started = self._completed + self._running
+            return SchedulerStats(
+                queue_depth={p: len(q) for p, q in self._queues.items()},
+                running=self._running,
+                completed=self._completed,
+                avg_wait=self._total_wait / started if started else 0.0,
+                max_wait=self._max_wait,
+                oldest_wait=max((now - job.enqueued_at for job in queued), default=0.0),
+                tenant_depth=dict(self._tenant_depth),
+            )
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False):
+        """
+        Stop accepting work
+
+        Args:
+            wait: Block until workers exit
+            cancel_pending: Cancel queued jobs instead of running them
+        """
+        with self._cond:
+            self._shutdown = True
+            if cancel_pending:
+                for queue in self._queues.values():
+                    for _, _, job in queue:
+                        job.future.cancel()
+                    queue.clear()
+                self._tenant_depth.clear()
+                self._class_depth.clear()
+                self._last_tag.clear()
+            self._cond.notify_all()
+
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
@@ -0,0 +1,201 @@
+"""Tests for the near-duplicate prompt cache"""
+
+import io
+import json
+
+import pytest
+
+from duckai import DuckAIClient, PromptCache
+from duckai.cache import normalize_prompt
+
+
+class FakeResponse:
+    """Minimal streaming chat response"""
+
+    headers = {}
+
+    def __init__(self, text):
+        body = f"data: {json.dumps({'message': text})}\ndata: [DONE]\n"
+        self._body = io.BytesIO(body.encode("utf-8"))
+
+    def read(self, size=-1):
+        return self._body.read(size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+def make_client(cache, answer="fresh"):
+    client = DuckAIClient(cache=cache)
+    client.vqd = "vqd"
+    client.requests = 0
+
+    def open_(req):
+        client.requests += 1
+        return FakeResponse(answer)
+
+    client.opener.open = open_
+    return client
+
+
+def test_whitespace_case_and_punctuation_hit():
+    cache = PromptCache()
+    cache.put("How do I sort a list in Python?", "m", "sorted()")
+
+    assert cache.get("  how do i SORT a list\nin python ", "m") == "sorted()"
+    assert cache.stats().exact_hits == 1
+
+
+def test_filler_word_in_long_prompt_is_near_hit():
+    prompt = (
+        "Explain how the Python garbage collector handles reference cycles "
+        "between objects that define finalizers and why it matters"
+    )
+    cache = PromptCache()
+    cache.put(prompt, "m", "answer")
+
+    assert cache.get(prompt + " please", "m") == "answer"
+    assert cache.stats().near_hits == 1
+
+
+@pytest.mark.parametrize(
+    "stored, asked",
+    [
+        ("What is C++?", "What is C?"),
+        ("What is 2+2?", "What is 22?"),
+        ("What is 2+2", "What is 2*2"),
+        ("What is 2+2", "What is 2/2"),
+        ("Is Rust faster than Go", "Is Go faster than Rust"),
+        ("How do I sort a list in Python?", "How do I not sort a list in Python?"),
+        ("How do I sort a list in Python?", "Python in list a sort I do how"),
+    ],
+)
+def test_different_meaning_misses(stored, asked):
+    cache = PromptCache()
+    cache.put(stored, "m", "cached")
+
+    assert normalize_prompt(stored) != normalize_prompt(asked)
+    assert cache.get(asked, "m") is None
+    assert cache.stats().misses == 1
+
+
+LONG_PROMPT = (
+    "I have a pandas dataframe with columns named product, region, price and "
+    "quantity loaded from a csv export of last year's sales. Write a short "
+    "python function that filters rows where the price column is above 100 "
+    "dollars, groups the remaining rows by region, sums the quantity per group "
+    "and returns the result sorted from the largest total to the smallest one."
+)
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        ("is above 100", "is above 500"),
+        ("is above 100", "is not above 100"),
+        ("is above 100", "is below 100"),
+        ("largest total to the smallest", "smallest total to the largest"),
+    ],
+)
+def test_one_word_change_in_long_prompt_misses(old, new):
+    cache = PromptCache()
+    cache.put(LONG_PROMPT, "m", "cached")
+
+    asked = LONG_PROMPT.replace(old, new)
+    assert asked != LONG_PROMPT
+    assert cache.get(asked, "m") is None
+    assert cache.stats().near_hits == 0
+
+
+def test_filler_edits_are_bounded():
+    cache = PromptCache()
+    cache.put(LONG_PROMPT, "m", "cached")
+
+    assert cache.get("Hey, " + LONG_PROMPT + " Please.", "m") == "cached"
+    assert cache.get("Hey so um " + LONG_PROMPT + " ok please", "m") is None
+
+
+@pytest.mark.parametrize(
+    "stored, asked",
+    [
+        ("is this very very good", "is this very very very good"),
+        ("print 1 1", "print 1 1 1"),
+    ],
+)
+def test_repeated_words_are_not_near_matches(stored, asked):
+    strict = PromptCache(thresholds={"strict": 1.0})
+    strict.put(stored, "strict", "cached")
+    strict.put(stored, "lenient", "cached")
+
+    assert strict.get(asked, "strict") is None
+    assert strict.get(asked, "lenient") is None
+    assert strict.stats().near_hits == 0
+
+
+def test_lru_eviction():
+    cache = PromptCache(max_entries=2)
+    cache.put("first prompt here", "m", "1")
+    cache.put("second prompt here", "m", "2")
+    assert cache.get("first prompt here", "m") == "1"  # now most recent
+
+    cache.put("third prompt here", "m", "3")
+
+    assert cache.get("second prompt here", "m") is None
+    assert cache.get("first prompt here", "m") == "1"
+    assert cache.get("third prompt here", "m") == "3"
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.entries == len(cache) == 2
+
+
+def test_per_model_threshold():
+    cache = PromptCache(threshold=0.9, thresholds={"strict": 1.0})
+    base = "Summarize the plot of the first three Harry Potter books in detail"
+    for model in ("lenient", "strict"):
+        cache.put(base, model, model)
+
+    assert cache.threshold_for("strict") == 1.0
+    assert cache.threshold_for("lenient") == 0.9
+    assert cache.get(base + " please", "lenient") == "lenient"
+    assert cache.get(base + " please", "strict") is None
+    # Entries are never shared across models
+    assert cache.get(base, "other") is None
+
+
+def test_client_serves_first_turn_from_cache():
+    cache = PromptCache()
+    make_client(cache, "4").chat("What is 2+2?", "m")
+
+    client = make_client(cache)
+    assert client.chat("what is 2+2", "m") == "4"
+    assert client.requests == 0
+    assert client.messages[-1] == {"role": "assistant", "content": "4"}
+
+    stream_client = make_client(cache)
+    assert list(stream_client.stream_chat("What is 2+2?", "m")) == ["4"]
+    assert stream_client.requests == 0
+
+
+def test_client_never_uses_cache_with_history():
+    cache = PromptCache()
+    cache.put("What is 2+2?", "m", "cached")
+
+    client = make_client(cache)
+    client.messages = [
+        {"role": "user", "content": "Use base 3"},
+        {"role": "assistant", "content": "ok"},
+    ]
+    assert client.chat("What is 2+2?", "m") == "fresh"
+    assert client.requests == 1
+
+    stream_client = make_client(cache)
+    stream_client.messages = [{"role": "user", "content": "hi"}]
+    assert list(stream_client.stream_chat("What is 2+2?", "m")) == ["fresh"]
+    assert stream_client.requests == 1
+
+    # Follow-up answers are not stored either
+    assert cache.stats().entries == 1
+    assert cache.stats().hits == 0
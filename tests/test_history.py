@@ -0,0 +1,101 @@
+"""Tests for shared-prefix conversation history"""
+
+import json
+
+import pytest
+
+from duckai import DuckAIClient, Conversation, HistoryNode, Message
+
+
+def make_client(*turns):
+    client = DuckAIClient()
+    for role, content in turns:
+        client._add_message(role, content)
+    return client
+
+
+def test_branches_share_prefix_nodes():
+    client = make_client(("user", "Suggest a name"), ("assistant", "duckai"))
+    branch_point = client.fork()
+
+    client._add_message("user", "Shorter")
+    short = client.fork()
+    client.checkout(branch_point)
+    client._add_message("user", "Funnier")
+    funny = client.fork()
+
+    assert short.parent is branch_point
+    assert funny.parent is branch_point
+    for a, b in zip(short.nodes()[:2], funny.nodes()[:2]):
+        assert a is b
+    assert [m["content"] for m in short.to_api_format()][-1] == "Shorter"
+    assert [m["content"] for m in funny.to_api_format()][-1] == "Funnier"
+    assert len(branch_point) == 2
+
+
+def test_chat_payload_matches_json_dumps():
+    client = make_client(
+        ("user", 'Quote "this"\nand ünïcode'),
+        ("assistant", "ok\t\\"),
+        ("user", "again"),
+    )
+    expected = json.dumps(
+        {"model": "gpt-4o-mini", "messages": list(client.messages)}
+    ).encode("utf-8")
+
+    assert client._build_chat_data("gpt-4o-mini") == expected
+    assert json.loads(client.history.to_json()) == list(client.messages)
+
+
+def test_empty_payload_matches_json_dumps():
+    client = DuckAIClient()
+    assert client._build_chat_data("m") == json.dumps(
+        {"model": "m", "messages": []}
+    ).encode("utf-8")
+
+
+def test_checkout_none_clears_history():
+    client = make_client(("user", "hi"))
+    saved = client.fork()
+
+    client.checkout(None)
+    assert client.messages == ()
+    assert client.fork() is None
+
+    client.checkout(saved)
+    assert client.messages == ({"role": "user", "content": "hi"},)
+
+
+def test_messages_setter_round_trips():
+    messages = [
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "hello"},
+    ]
+    client = DuckAIClient()
+    client.messages = messages
+
+    assert list(client.messages) == messages
+    assert len(client.history) == 2
+
+    client.messages = []
+    assert client.history is None
+
+
+def test_messages_is_read_only():
+    client = make_client(("user", "hi"))
+    with pytest.raises(AttributeError):
+        client.messages.append({"role": "user", "content": "lost"})
+
+
+def test_conversation_to_history():
+    conv = Conversation(
+        id="c",
+        messages=[Message("user", "a"), Message("assistant", "b")],
+        model="gpt-4o-mini",
+        created_at=None,
+    )
+    node = conv.to_history()
+
+    assert isinstance(node, HistoryNode)
+    assert node.to_api_format() == conv.to_api_format()
+    assert node.messages()[0] is conv.messages[0]
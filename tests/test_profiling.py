@@ -0,0 +1,119 @@
+"""Tests for opt-in request profiling"""
+
+import re
+import threading
+import time
+import tracemalloc
+
+from duckai import profiling
+from duckai.profiling import profile_request
+
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    data = []
+    while time.perf_counter() < deadline:
+        data.append(str(len(data)))
+    return data
+
+
+def check_reports(paths):
+    with open(paths["collapsed"], encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert all(frame for frame in stack.split(";"))
+    assert any("busy (test_profiling.py" in line for line in lines)
+
+    with open(paths["alloc"], encoding="utf-8") as f:
+        report = f.read()
+    assert re.search(r"^Wall time: \d+\.\d+s$", report, re.M)
+    assert re.search(r"^Samples: [1-9]\d*$", report, re.M)
+    assert re.search(r"^Peak traced memory: \d+\.\d KiB$", report, re.M)
+    assert "Top " in report
+    assert "threading.py" not in report
+    assert profiling.__file__ not in report
+
+
+def test_disabled_without_profile_dir(monkeypatch):
+    monkeypatch.delenv(profiling.PROFILE_ENV, raising=False)
+    with profile_request("chat") as paths:
+        assert paths is None
+    assert not tracemalloc.is_tracing()
+
+
+def test_writes_collapsed_and_alloc_reports(tmp_path):
+    with profile_request("chat", str(tmp_path)) as paths:
+        busy(0.05)
+
+    check_reports(paths)
+    assert not tracemalloc.is_tracing()
+
+
+def test_alloc_report_shows_request_allocations(tmp_path):
+    with profile_request("chat", str(tmp_path)) as paths:
+        kept = busy(0.05)
+
+    with open(paths["alloc"], encoding="utf-8") as f:
+        report = f.read()
+    assert "test_profiling.py" in report
+    assert kept
+
+
+def test_env_var_enables_profiling(tmp_path, monkeypatch):
+    monkeypatch.setenv(profiling.PROFILE_ENV, str(tmp_path))
+    with profile_request("stream_chat") as paths:
+        busy(0.02)
+
+    assert paths["collapsed"].startswith(str(tmp_path))
+
+
+def test_overlapping_profiles(tmp_path):
+    first_entered, first_exited = threading.Event(), threading.Event()
+    results, errors = {}, []
+
+    def first():
+        try:
+            with profile_request("first", str(tmp_path)) as paths:
+                first_entered.set()
+                busy(0.02)
+            results["first"] = paths
+        except Exception as e:
+            errors.append(e)
+        finally:
+            first_exited.set()
+
+    def second():
+        try:
+            assert first_entered.wait(5)
+            with profile_request("second", str(tmp_path)) as paths:
+                # Still profiling after the other request has finished
+                assert first_exited.wait(5)
+                busy(0.02)
+            results["second"] = paths
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=first), threading.Thread(target=second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    check_reports(results["first"])
+    check_reports(results["second"])
+    assert not tracemalloc.is_tracing()
+    assert profiling._active_profiles == 0
+
+
+def test_external_tracing_left_running(tmp_path):
+    tracemalloc.start()
+    try:
+        with profile_request("chat", str(tmp_path)):
+            busy(0.01)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,160 @@
+"""Tests for the priority request scheduler"""
+
+import threading
+import time
+
+import pytest
+
+from duckai.scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, RequestScheduler
+
+
+def start_gate(scheduler):
+    """Occupy the only worker until the returned event is set"""
+    started, release = threading.Event(), threading.Event()
+
+    def gate():
+        started.set()
+        release.wait(5)
+
+    future = scheduler.submit(gate)
+    assert started.wait(5)
+    return release, future
+
+
+def test_interactive_runs_before_queued_batch():
+    order = []
+    scheduler = RequestScheduler(max_concurrency=1)
+    release, _ = start_gate(scheduler)
+
+    for i in range(3):
+        scheduler.batch(order.append, f"batch{i}")
+    scheduler.interactive(order.append, "interactive")
+
+    release.set()
+    scheduler.shutdown()
+    assert order == ["interactive", "batch0", "batch1", "batch2"]
+
+
+def test_weighted_fair_order_between_tenants():
+    order = []
+    scheduler = RequestScheduler(max_concurrency=1, weights={"a": 2})
+    release, _ = start_gate(scheduler)
+
+    for i in range(4):
+        for tenant in "ab":
+            scheduler.batch(order.append, f"{tenant}{i}", tenant=tenant)
+
+    release.set()
+    scheduler.shutdown()
+    # "a" has twice the weight, so it gets two slots per "b" slot
+    assert order == ["a0", "b0", "a1", "a2", "b1", "a3", "b2", "b3"]
+
+
+def test_stats_queue_and_tenant_depth():
+    scheduler = RequestScheduler(max_concurrency=1)
+    release, _ = start_gate(scheduler)
+
+    scheduler.batch(len, "x", tenant="a")
+    scheduler.batch(len, "y", tenant="a")
+    scheduler.interactive(len, "z", tenant="b")
+
+    stats = scheduler.stats()
+    assert stats.queue_depth == {PRIORITY_BATCH: 2, PRIORITY_INTERACTIVE: 1}
+    assert stats.tenant_depth == {"a": 2, "b": 1}
+    assert stats.running == 1
+    assert scheduler.queue_depth() == 3
+    assert scheduler.queue_depth(PRIORITY_INTERACTIVE) == 1
+
+    release.set()
+    scheduler.shutdown()
+    stats = scheduler.stats()
+    assert stats.completed == 4
+    assert stats.tenant_depth == {}
+    assert scheduler.queue_depth() == 0
+
+
+def test_shutdown_cancels_pending():
+    calls = []
+    scheduler = RequestScheduler(max_concurrency=1)
+    release, gate = start_gate(scheduler)
+
+    pending = [scheduler.batch(calls.append, i) for i in range(3)]
+    scheduler.shutdown(wait=False, cancel_pending=True)
+    release.set()
+    scheduler.shutdown()
+
+    assert gate.done() and not gate.cancelled()
+    assert all(f.cancelled() for f in pending)
+    assert calls == []
+    with pytest.raises(RuntimeError):
+        scheduler.batch(calls.append, 4)
+
+
+def test_cancelled_jobs_are_not_counted():
+    calls = []
+    scheduler = RequestScheduler(max_concurrency=1)
+    release, _ = start_gate(scheduler)
+
+    cancelled = scheduler.batch(calls.append, "cancelled")
+    kept = scheduler.batch(calls.append, "kept")
+    assert cancelled.cancel()
+
+    release.set()
+    scheduler.shutdown()
+    assert calls == ["kept"]
+    assert kept.done()
+    assert scheduler.stats().completed == 2
+
+
+def test_invalid_weights_rejected():
+    with pytest.raises(ValueError):
+        RequestScheduler(weights={"x": 0})
+
+    scheduler = RequestScheduler()
+    with pytest.raises(ValueError):
+        scheduler.set_weight("x", -1)
+    scheduler.shutdown()
+
+
+@pytest.mark.parametrize("cost", [0, -5])
+def test_non_positive_cost_rejected(cost):
+    scheduler = RequestScheduler(max_concurrency=1)
+    with pytest.raises(ValueError):
+        scheduler.batch(len, "x", tenant="b", cost=cost)
+    assert scheduler.queue_depth() == 0
+    scheduler.shutdown()
+
+
+def test_idle_tenant_state_is_dropped():
+    scheduler = RequestScheduler(max_concurrency=1)
+    release, _ = start_gate(scheduler)
+
+    for i in range(200):
+        scheduler.batch(len, "x", tenant=f"job-{i}")
+    assert len(scheduler._last_tag) == 200
+
+    release.set()
+    scheduler.shutdown()
+    assert scheduler._last_tag == {}
+    assert scheduler._class_depth == {}
+
+
+def test_returning_tenant_starts_at_virtual_time():
+    order = []
+    scheduler = RequestScheduler(max_concurrency=1)
+    release, _ = start_gate(scheduler)
+
+    scheduler.batch(order.append, "a0", tenant="a")
+    release.set()
+    while scheduler.stats().completed < 2:
+        time.sleep(0.001)
+
+    # "a" went idle; it competes evenly with a newcomer rather than
+    # carrying an old tag
+    release, _ = start_gate(scheduler)
+    scheduler.batch(order.append, "b0", tenant="b")
+    scheduler.batch(order.append, "a1", tenant="a")
+    scheduler.batch(order.append, "b1", tenant="b")
+    release.set()
+    scheduler.shutdown()
+    assert order == ["a0", "b0", "a1", "b1"]